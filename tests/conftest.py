@@ -0,0 +1,20 @@
+import collections
+
+import pytest
+
+from typo import app as typo_app
+
+
+@pytest.fixture
+def temp_env(tmp_path, monkeypatch):
+    # Redirect POSTS_DB and uploads to temp paths and clear in-memory posts and caches
+    tmp_posts = tmp_path / 'posts.db'
+    monkeypatch.setattr(typo_app, 'POSTS_DB', str(tmp_posts))
+    uploads = tmp_path / 'uploads'
+    uploads.mkdir()
+    monkeypatch.setitem(typo_app.app.config, 'UPLOAD_FOLDER', str(uploads))
+    monkeypatch.setattr(typo_app, 'posts', collections.deque())
+    monkeypatch.setattr(typo_app, 'posts_by_id', {})
+    monkeypatch.setattr(typo_app, 'posts_json_cache', ({}, -1))
+    monkeypatch.setattr(typo_app, 'feed_html_cache', (None, None))
+    return tmp_posts, uploads
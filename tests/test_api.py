@@ -1,23 +1,13 @@
+import gzip
 import io
 import json
 import tempfile
+import time
 from typo import app as typo_app
 
 
-def setup_temp_env(tmp_path, monkeypatch):
-    # Redirect POSTS_FILE and uploads to temp paths and clear in-memory posts
-    tmp_posts = tmp_path / 'posts.json'
-    monkeypatch.setattr(typo_app, 'POSTS_FILE', str(tmp_posts))
-    uploads = tmp_path / 'uploads'
-    uploads.mkdir()
-    monkeypatch.setitem(typo_app.app.config, 'UPLOAD_FOLDER', str(uploads))
-    # reset in-memory posts
-    monkeypatch.setattr(typo_app, 'posts', [], raising=False)
-    return tmp_posts, uploads
-
-
-def test_api_crud(tmp_path, monkeypatch):
-    tmp_posts, uploads = setup_temp_env(tmp_path, monkeypatch)
+def test_api_crud(temp_env):
+    tmp_posts, uploads = temp_env
     client = typo_app.app.test_client()
 
     # Create post
@@ -38,6 +28,8 @@ def test_api_crud(tmp_path, monkeypatch):
     assert resp.status_code == 200
     single = resp.get_json()
     assert single['title'] == 'T1'
+    # compact output, keys in model order
+    assert resp.data.startswith(b'{"id":')
 
     # Update post
     resp = client.put(f'/api/posts/{post_id}', json={'title': 'T1-upd'})
@@ -51,3 +43,143 @@ def test_api_crud(tmp_path, monkeypatch):
     # Ensure gone
     resp = client.get(f'/api/posts/{post_id}')
     assert resp.status_code == 404
+
+
+def test_posts_list_cache_invalidated_on_mutation(temp_env):
+    client = typo_app.app.test_client()
+
+    client.post('/api/posts', json={'title': 'T1', 'content': 'C1'})
+    first = client.get('/api/posts')
+    # unchanged posts are served from the cached body
+    assert client.get('/api/posts').data == first.data
+
+    post_id = first.get_json()[0]['id']
+    client.put(f'/api/posts/{post_id}', json={'title': 'T1-upd'})
+    assert client.get('/api/posts').get_json()[0]['title'] == 'T1-upd'
+
+    client.delete(f'/api/posts/{post_id}')
+    assert client.get('/api/posts').get_json() == []
+
+
+def test_metrics_labelled_by_url_rule(temp_env):
+    client = typo_app.app.test_client()
+
+    client.get('/api/posts/does-not-exist')
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'endpoint="/api/posts/<post_id>"' in metrics
+    assert 'endpoint="/api/posts/does-not-exist"' not in metrics
+
+
+def test_posts_list_pagination(temp_env):
+    client = typo_app.app.test_client()
+    for i in range(5):
+        client.post('/api/posts', json={'title': f'T{i}', 'content': 'C'})
+
+    resp = client.get('/api/posts?limit=2')
+    assert [p['title'] for p in resp.get_json()] == ['T4', 'T3']
+    assert resp.headers['Link'] == '</api/posts?offset=2&limit=2>; rel="next"'
+
+    resp = client.get('/api/posts?offset=4&limit=2')
+    assert [p['title'] for p in resp.get_json()] == ['T0']
+    assert 'Link' not in resp.headers
+
+    assert client.get('/api/posts?limit=0').status_code == 400
+    assert client.get('/api/posts?offset=abc').status_code == 400
+
+
+def test_etag_not_modified(temp_env):
+    client = typo_app.app.test_client()
+    post_id = client.post('/api/posts', json={'title': 'T1', 'content': 'C1'}).get_json()['id']
+
+    for url in ('/api/posts', f'/api/posts/{post_id}', '/feed'):
+        resp = client.get(url)
+        etag = resp.headers['ETag']
+        resp = client.get(url, headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+        assert resp.data == b''
+
+        # a mutation changes the tag, so the stale one gets the full body again
+        client.put(f'/api/posts/{post_id}', json={'title': url})
+        resp = client.get(url, headers={'If-None-Match': etag})
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+
+
+def test_posts_list_gzip(temp_env):
+    client = typo_app.app.test_client()
+    for i in range(10):
+        client.post('/api/posts', json={'title': f'Title {i}', 'content': 'Some content ' * 10})
+
+    plain = client.get('/api/posts')
+    resp = client.get('/api/posts', headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(resp.data) == plain.data
+
+    # the compressed variant's ETag is still recognised
+    resp = client.get('/api/posts', headers={'Accept-Encoding': 'gzip', 'If-None-Match': resp.headers['ETag']})
+    assert resp.status_code == 304
+
+    resp = client.get('/feed', headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+
+
+def test_last_modified_not_modified(temp_env, monkeypatch):
+    client = typo_app.app.test_client()
+    client.post('/api/posts', json={'title': 'T1', 'content': 'C1'})
+    # changes are only trusted once their second is over
+    monkeypatch.setattr(typo_app, 'posts_modified_at', time.time() - 5)
+    monkeypatch.setattr(typo_app, 'customization_modified_at', time.time() - 5)
+
+    for url in ('/api/posts', '/feed'):
+        resp = client.get(url)
+        last_modified = resp.headers['Last-Modified']
+        resp = client.get(url, headers={'If-Modified-Since': last_modified})
+        assert resp.status_code == 304
+
+    client.post('/api/posts', json={'title': 'T2', 'content': 'C2'})
+    resp = client.get('/api/posts', headers={'If-Modified-Since': last_modified})
+    assert resp.status_code == 200
+
+
+def test_api_created_posts_are_newest_first(temp_env):
+    client = typo_app.app.test_client()
+    client.post('/api/posts', json={'title': 'T1', 'content': 'C1'})
+    client.post('/api/posts', json={'title': 'T2', 'content': 'C2'})
+
+    # same order as a fresh load from the database
+    resp = client.get('/api/posts')
+    assert [p['title'] for p in resp.get_json()] == ['T2', 'T1']
+    typo_app.flush_pending_writes()
+    assert [p.title for p in typo_app.load_posts()] == ['T2', 'T1']
+
+
+def test_posts_page_survives_concurrent_create(temp_env, monkeypatch):
+    client = typo_app.app.test_client()
+    for i in range(3):
+        client.post('/api/posts', json={'title': f'T{i}', 'content': 'C'})
+
+    # a post created while the page is being serialized must not break it
+    to_json = typo_app.BlogPost.to_json
+    created = []
+
+    def to_json_and_create(post):
+        if not created:
+            created.append(typo_app.BlogPost(title='T3', content='C'))
+            typo_app.add_post(created[0])
+        return to_json(post)
+
+    monkeypatch.setattr(typo_app.BlogPost, 'to_json', to_json_and_create)
+    resp = client.get('/api/posts')
+    assert resp.status_code == 200
+    assert [p['title'] for p in resp.get_json()] == ['T2', 'T1', 'T0']
+
+
+def test_single_post_etag_stable_across_processes(temp_env, monkeypatch):
+    client = typo_app.app.test_client()
+    post_id = client.post('/api/posts', json={'title': 'T1', 'content': 'C1'}).get_json()['id']
+    etag = client.get(f'/api/posts/{post_id}').headers['ETag']
+
+    # another worker (or a restarted one) has a different salt
+    monkeypatch.setattr(typo_app, 'ETAG_SALT', 'other')
+    resp = client.get(f'/api/posts/{post_id}', headers={'If-None-Match': etag})
+    assert resp.status_code == 304
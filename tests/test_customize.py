@@ -21,9 +21,50 @@ def test_customize_save_and_cleanup(tmp_path, monkeypatch):
     resp = client.post('/customize', data=data, content_type='multipart/form-data', follow_redirects=True)
     assert resp.status_code in (200, 302)
 
-    # load customization file
+    # load customization file once the queued write has been flushed
+    typo_app.flush_pending_writes()
     assert tmp_custom.exists()
+    assert tmp_custom.stat().st_mode & 0o777 == 0o644
     with open(tmp_custom, 'r') as f:
         import json
         d = json.load(f)
     assert d.get('bg_style') == 'gradient3'
+
+
+def test_customize_invalidates_feed(temp_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(typo_app, 'CUSTOMIZATION_FILE', str(tmp_path / 'custom.json'))
+    monkeypatch.setattr(typo_app, 'customization', typo_app.BlogCustomization(), raising=False)
+    monkeypatch.setattr(typo_app, 'customization_items', (), raising=False)
+
+    client = typo_app.app.test_client()
+    before = client.get('/feed')
+    client.post('/customize', data={'bg_style': 'gradient2'})
+    after = client.get('/feed')
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert after.get_data() != before.get_data()
+
+
+def test_customization_written_outside_write_lock(tmp_path, monkeypatch):
+    import threading
+    monkeypatch.setattr(typo_app, 'CUSTOMIZATION_FILE', str(tmp_path / 'custom.json'))
+    write = typo_app.write_customization_file
+    lock_free = []
+
+    def write_and_probe_lock(path, settings):
+        # another thread (a request) can take the lock while the file is written
+        def probe():
+            acquired = typo_app.write_lock.acquire(timeout=1)
+            lock_free.append(acquired)
+            if acquired:
+                typo_app.write_lock.release()
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        write(path, settings)
+
+    monkeypatch.setattr(typo_app, 'write_customization_file', write_and_probe_lock)
+    typo_app.save_customization(typo_app.BlogCustomization())
+    typo_app.flush_pending_writes()
+    # the background flusher may have written it first, either way the lock was free
+    assert lock_free and all(lock_free)
+    assert (tmp_path / 'custom.json').exists()
@@ -1,5 +1,7 @@
+import json
+
 import pytest
-from typo.app import BlogPost, BlogCustomization
+from typo.app import BlogPost, BlogCustomization, allowed_file
 
 
 def test_blogpost_to_from_dict():
@@ -11,6 +13,17 @@ def test_blogpost_to_from_dict():
     assert new.image_path == 'uploads/img.jpg'
 
 
+def test_blogpost_cached_forms_cleared_on_edit():
+    post = BlogPost(title='Hi', content='Content')
+    assert post.to_dict() is post.to_dict()
+    assert json.loads(post.to_json()) == post.to_dict()
+
+    # assigning a field drops the cached forms
+    post.title = 'Edited'
+    assert post.to_dict()['title'] == 'Edited'
+    assert json.loads(post.to_json())['title'] == 'Edited'
+
+
 def test_customization_to_from_dict():
     c = BlogCustomization()
     c.header_image = 'uploads/header.png'
@@ -19,3 +32,10 @@ def test_customization_to_from_dict():
     nc = BlogCustomization.from_dict(d)
     assert nc.header_image == 'uploads/header.png'
     assert nc.bg_style == 'gradient2'
+
+
+def test_allowed_file():
+    assert allowed_file('photo.jpg')
+    assert allowed_file('photo.final.JPEG')
+    assert not allowed_file('photo.jpg.exe')
+    assert not allowed_file('png')
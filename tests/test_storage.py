@@ -1,22 +1,168 @@
 import json
 import os
 import importlib
+import sqlite3
+import time
 
 import pytest
 
 
 def test_save_and_load_posts(tmp_path, monkeypatch):
     app = importlib.import_module('typo.app')
-    tmp_file = tmp_path / 'posts.json'
-    # point POSTS_FILE to temp file
-    monkeypatch.setattr(app, 'POSTS_FILE', str(tmp_file))
+    tmp_file = tmp_path / 'posts.db'
+    # point POSTS_DB to temp file
+    monkeypatch.setattr(app, 'POSTS_DB', str(tmp_file))
 
-    # start with empty
-    posts = []
     from typo.app import BlogPost
     p = BlogPost(title='T', content='C')
-    posts.append(p)
-    app.save_posts(posts)
+    app.insert_post(p)
+    app.flush_pending_writes()
     loaded = app.load_posts()
     assert len(loaded) == 1
     assert loaded[0].title == 'T'
+
+
+def test_update_and_delete_rows(tmp_path, monkeypatch):
+    app = importlib.import_module('typo.app')
+    tmp_file = tmp_path / 'posts.db'
+    monkeypatch.setattr(app, 'POSTS_DB', str(tmp_file))
+
+    from typo.app import BlogPost
+    a = BlogPost(title='A', content='C', id='a', created_at='2025-01-01T00:00:00')
+    b = BlogPost(title='B', content='C', id='b', created_at='2025-01-02T00:00:00')
+    app.insert_post(a)
+    app.insert_post(b)
+
+    b.title = 'B2'
+    app.update_post_row(b)
+    app.flush_pending_writes()
+    # newest first
+    assert [p.title for p in app.load_posts()] == ['B2', 'A']
+
+    app.delete_post_row(a.id)
+    app.flush_pending_writes()
+    assert [p.id for p in app.load_posts()] == ['b']
+
+
+def test_read_legacy_posts_json(tmp_path):
+    app = importlib.import_module('typo.app')
+    legacy = tmp_path / 'posts.json'
+    legacy.write_text(json.dumps([
+        {'id': 'b', 'title': 'B', 'content': 'C', 'created_at': '2025-01-02T00:00:00'},
+        {'id': 'a', 'title': 'A', 'content': 'C', 'created_at': '2025-01-01T00:00:00'},
+    ]))
+    assert [p.id for p in app.read_posts_json(str(legacy))] == ['b', 'a']
+
+
+def test_seed_posts_db_only_once(tmp_path, monkeypatch):
+    app = importlib.import_module('typo.app')
+    legacy = tmp_path / 'posts.json'
+    legacy.write_text(json.dumps([{'id': 'a', 'title': 'A', 'content': 'C'}]))
+    monkeypatch.setattr(app, 'LEGACY_POSTS_FILE', str(legacy))
+    monkeypatch.setattr(app, 'POSTS_DB', str(tmp_path / 'posts.db'))
+
+    app.seed_posts_db()
+    assert [p.id for p in app.load_posts()] == ['a']
+
+    # deleting every post must not bring the samples back on the next start
+    app.delete_post_row('a')
+    app.flush_pending_writes()
+    app.seed_posts_db()
+    assert app.load_posts() == []
+
+
+def test_mutations_are_flushed_in_background(temp_env):
+    app = importlib.import_module('typo.app')
+
+    client = app.app.test_client()
+    for i in range(3):
+        resp = client.post('/api/posts', json={'title': f'T{i}', 'content': 'C'})
+        assert resp.status_code == 201
+
+    # the background flusher writes the queued rows shortly after the requests
+    deadline = time.time() + 5
+    while len(app.load_posts()) < 3 and time.time() < deadline:
+        time.sleep(0.05)
+    assert [p.title for p in app.load_posts()] == ['T2', 'T1', 'T0']
+
+
+def test_flush_early_when_many_writes_queued(tmp_path, monkeypatch):
+    app = importlib.import_module('typo.app')
+    monkeypatch.setattr(app, 'POSTS_DB', str(tmp_path / 'posts.db'))
+    monkeypatch.setattr(app, 'FLUSH_MAX_PENDING', 3)
+    # far longer than the test waits, so only the size threshold can trigger the flush
+    monkeypatch.setattr(app, 'FLUSH_DELAY', 60)
+
+    from typo.app import BlogPost
+    for i in range(3):
+        app.insert_post(BlogPost(title=f'T{i}', content='C'))
+
+    deadline = time.time() + 5
+    while len(app.load_posts()) < 3 and time.time() < deadline:
+        time.sleep(0.05)
+    assert len(app.load_posts()) == 3
+
+
+def test_sync_posts_from_other_connection(temp_env):
+    app = importlib.import_module('typo.app')
+    tmp_file, _ = temp_env
+    app.get_posts_db()
+
+    def commit_from_other_worker(post_id, created_at):
+        other = sqlite3.connect(str(tmp_file))
+        with other:
+            other.execute(
+                'INSERT INTO posts VALUES (?, ?, ?, ?, ?)',
+                (post_id, f'From other {post_id}', 'C', created_at, None)
+            )
+        other.close()
+
+    # a commit made before this worker's first check is picked up too
+    commit_from_other_worker('x', '2025-01-01T00:00:00')
+    app.sync_posts_from_db()
+    assert [p.id for p in app.posts] == ['x']
+
+    version = app.posts_version
+    commit_from_other_worker('y', '2025-01-02T00:00:00')
+    app.sync_posts_from_db()
+    assert [p.id for p in app.posts] == ['y', 'x']
+    assert app.posts_by_id['y'].title == 'From other y'
+    assert app.posts_version > version
+
+
+def test_sync_only_for_post_views(temp_env):
+    app = importlib.import_module('typo.app')
+    tmp_file, _ = temp_env
+    app.sync_posts_from_db()
+
+    other = sqlite3.connect(str(tmp_file))
+    with other:
+        other.execute(
+            'INSERT INTO posts VALUES (?, ?, ?, ?, ?)',
+            ('x', 'From other', 'C', '2025-01-01T00:00:00', None)
+        )
+    other.close()
+
+    client = app.app.test_client()
+    client.get('/health')
+    assert list(app.posts) == []
+    resp = client.get('/api/posts/x')
+    assert resp.get_json()['title'] == 'From other'
+
+
+def test_edit_after_reload_updates_current_post(temp_env):
+    app = importlib.import_module('typo.app')
+
+    app.add_post(app.BlogPost(title='A', content='C', id='a'))
+    app.flush_pending_writes()
+    stale = app.posts_by_id['a']
+    # a reload replaces the post objects
+    app.posts.clear()
+    app.posts.extend(app.load_posts())
+    app.posts_by_id.update((p.id, p) for p in app.posts)
+    assert app.posts_by_id['a'] is not stale
+
+    assert app.edit_post(stale.id, title='A2') is app.posts_by_id['a']
+    assert app.posts_by_id['a'].title == 'A2'
+    assert app.remove_post('a').title == 'A2'
+    assert list(app.posts) == [] and app.remove_post('a') is None
@@ -2,14 +2,8 @@ import io
 from typo import app as typo_app
 
 
-def test_file_upload_and_post_create(tmp_path, monkeypatch):
-    # Setup temp env
-    tmp_posts = tmp_path / 'posts.json'
-    monkeypatch.setattr(typo_app, 'POSTS_FILE', str(tmp_posts))
-    uploads = tmp_path / 'uploads'
-    uploads.mkdir()
-    monkeypatch.setitem(typo_app.app.config, 'UPLOAD_FOLDER', str(uploads))
-    monkeypatch.setattr(typo_app, 'posts', [], raising=False)
+def test_file_upload_and_post_create(temp_env):
+    tmp_posts, uploads = temp_env
 
     client = typo_app.app.test_client()
 
@@ -26,3 +20,49 @@ def test_file_upload_and_post_create(tmp_path, monkeypatch):
     # Check that file was saved
     saved_files = list(uploads.iterdir())
     assert any(f.name.endswith('.jpg') for f in saved_files)
+
+
+def test_upload_moved_into_place_without_leftovers(temp_env):
+    tmp_posts, uploads = temp_env
+
+    client = typo_app.app.test_client()
+
+    data = {
+        'title': 'UploadTest',
+        'content': 'Has image',
+        'image': (io.BytesIO(b'fake-image-bytes'), 'test.jpg')
+    }
+    client.post('/posts/create', data=data, content_type='multipart/form-data')
+    # a rejected upload must not leave its temporary file behind either
+    data = {
+        'title': 'Rejected',
+        'content': 'Bad extension',
+        'image': (io.BytesIO(b'not-an-image'), 'test.exe')
+    }
+    client.post('/posts/create', data=data, content_type='multipart/form-data')
+
+    # newest post first in the feed
+    assert [p.title for p in typo_app.posts] == ['Rejected', 'UploadTest']
+
+    saved_files = list(uploads.iterdir())
+    assert len(saved_files) == 1
+    assert saved_files[0].name.endswith('-test.jpg')
+    assert saved_files[0].read_bytes() == b'fake-image-bytes'
+
+
+def test_uploaded_file_served_conditionally(tmp_path, monkeypatch):
+    uploads = tmp_path / 'uploads'
+    uploads.mkdir()
+    (uploads / 'img.jpg').write_bytes(b'image-bytes')
+    monkeypatch.setitem(typo_app.app.config, 'UPLOAD_FOLDER', str(uploads))
+
+    client = typo_app.app.test_client()
+    resp = client.get('/uploads/img.jpg')
+    assert resp.status_code == 200
+    assert resp.data == b'image-bytes'
+
+    resp = client.get('/uploads/img.jpg', headers={'If-None-Match': resp.headers['ETag']})
+    assert resp.status_code == 304
+
+    with typo_app.app.test_request_context():
+        assert typo_app.upload_url('uploads/img.jpg') == '/uploads/img.jpg'
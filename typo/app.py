@@ -7,7 +7,7 @@ for blog posts with image upload support and customizable themes.
 Features:
 - Create, read, update, delete blog posts
 - Image upload and management
-- JSON-based data persistence
+- SQLite-based data persistence
 - Blog customization (header images, background styles)
 - Clean, responsive web interface
 
@@ -15,30 +15,142 @@ Author: Sofia Claudia San Jose Bonoan
 Date: October 2025
 """
 
-from flask import Flask, jsonify, request, render_template, redirect, url_for, g
+from flask import Flask, Request, Response, current_app, jsonify, request, render_template, redirect, send_from_directory, url_for, g
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from datetime import datetime
 from werkzeug.utils import secure_filename
-import json
+import atexit
+import collections
+import decimal
+import gzip
+import hashlib
+import itertools
+import operator
+import orjson
 import os
+import secrets
+import sqlite3
+import tempfile
+import threading
 import time
 
 # Prometheus client for metrics
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
+def orjson_default(o):
+    """Serialize the types Flask's default JSON provider handles but orjson doesn't."""
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson, so jsonify and app.json serialize with a
+    C extension instead of the standard library json module. Honours the same
+    sort_keys and compact settings as Flask's default provider.
+    """
+    sort_keys = True
+    compact = None
+    mimetype = 'application/json'
+
+    def orjson_option(self, indent=False):
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=orjson_default, option=self.orjson_option(bool(kwargs.get('indent')))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Pretty-print in debug mode unless compact output was requested, like Flask does
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=orjson_default, option=self.orjson_option(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 # Flask application configuration
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+# Emit keys in model order and without indentation, even in debug mode
+app.json.sort_keys = False
+app.json.compact = True
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'static/uploads')
+# Create the upload directory once at startup instead of checking on every upload
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size limit
+# Behind a server that understands X-Sendfile, let it send uploaded images itself
+app.config['USE_X_SENDFILE'] = os.environ.get('TYPO_USE_X_SENDFILE') == '1'
+
+# How long browsers may reuse an uploaded image before revalidating it
+UPLOAD_MAX_AGE = 7 * 24 * 3600
+# app.static_folder is a property that joins the path on every access, resolve it once
+STATIC_DIR = app.static_folder
+
+# Compress JSON and HTML responses for clients that accept it
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html']
+app.config['COMPRESS_MIN_SIZE'] = 512
+app.config['COMPRESS_LEVEL'] = 6
+# Leave streamed files (static files, uploads) to sendfile instead of compressing them in Python
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
 
 # Security: Define allowed file extensions for uploads
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# The same extensions as filename suffixes, for a single str.endswith check
+ALLOWED_SUFFIXES = tuple(sorted('.' + ext for ext in ALLOWED_EXTENSIONS))
+
+# Posts are stored in an SQLite database, each mutation only touches its own row
+POSTS_DB = os.path.join(os.path.dirname(__file__), 'posts.db')
+# Size at which SQLite folds the write-ahead log back into the database file
+WAL_CHECKPOINT_BYTES = 1024 * 1024
+# Posts file used before SQLite (shipped with sample posts), imported once
+# when the database is created
+LEGACY_POSTS_FILE = os.path.join(os.path.dirname(__file__), 'posts.json')
+
+# Seconds to wait after a mutation before writing it out, so bursts share one write
+FLUSH_DELAY = 0.2
+# Number of queued post writes that triggers a flush without waiting for FLUSH_DELAY
+FLUSH_MAX_PENDING = 500
+
+# Writes waiting for the background flusher, keyed by the file they belong to.
+# The lock also covers the in-memory posts, which change together with their
+# queued writes; it is reentrant so those changes can call queue_post_write.
+write_lock = threading.RLock()
+# Serializes writes of the customization file, which happen outside write_lock
+customization_file_lock = threading.Lock()
+pending_post_writes = {}
+pending_customization = {}
+writes_pending = threading.Event()
+flush_now = threading.Event()
+
+# Page size of GET /api/posts when no limit is given, and the largest one allowed
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
-# File paths for JSON data storage
-POSTS_FILE = os.path.join(os.path.dirname(__file__), 'posts.json')
+# Incremented on every posts mutation; rendered responses are cached against it
+posts_version = 0
+# Unix time of the last posts and customization changes, for Last-Modified headers
+posts_modified_at = time.time()
+customization_modified_at = time.time()
+# Serialized pages of GET /api/posts by (offset, limit) as [body, gzipped body],
+# and the version they match
+posts_json_cache = ({}, -1)
+feed_html_cache = (None, None)
 
 # Application start time for health reporting
 APP_START_TIME = time.time()
 
+# Mixed into ETags built from per-process state (posts_version), so tags
+# handed out before a restart or by another worker never match this process
+ETAG_SALT = secrets.token_hex(4)
+
 # Prometheus metrics
 REQUEST_COUNT = Counter('typo_request_count', 'Total Request Count', ['method', 'endpoint', 'http_status'])
 REQUEST_LATENCY = Histogram('typo_request_latency_seconds', 'Request latency', ['endpoint'])
@@ -55,14 +167,91 @@ def allowed_file(filename):
     Returns:
         bool: True if file extension is allowed, False otherwise
     """
-    # Check if filename has extension and if it's in allowed list
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    # Check the lowercased filename against all allowed suffixes in one C-level call
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
+
+class UploadRequest(Request):
+    """
+    Request class that streams uploaded files straight into a temporary file
+    inside the upload folder, so keeping an upload is a rename rather than
+    another full copy of the file.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Temporary files created for this request's uploads
+        self.upload_temp_files = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Not a context manager: Werkzeug owns the stream and closes it with the request
+        stream = tempfile.NamedTemporaryFile(dir=current_app.config['UPLOAD_FOLDER'], prefix='.upload-', delete=False)  # noqa: SIM115
+        self.upload_temp_files.append(stream.name)
+        return stream
+
+app.request_class = UploadRequest
+
+def upload_filename(original, prefix=''):
+    """
+    Build the name an upload is stored under.
+    
+    Args:
+        original (str): Filename as sent by the client
+        prefix (str, optional): Prefix identifying the kind of upload
+        
+    Returns:
+        str: Secured filename, prefixed with a nanosecond timestamp to prevent conflicts
+    """
+    # Secure the filename to prevent directory traversal attacks
+    return f"{prefix}{time.time_ns()}-{secure_filename(original)}"
+
+def save_upload(file, filename):
+    """
+    Store an uploaded file in the upload folder under the given name.
+    
+    Args:
+        file (FileStorage): Uploaded file from request.files
+        filename (str): Secured filename to store the upload under
+    """
+    path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    temp_path = getattr(file.stream, 'name', None)
+    if isinstance(temp_path, str) and temp_path in request.upload_temp_files:
+        # Already on disk next to its destination, just move it into place
+        file.stream.close()
+        os.replace(temp_path, path)
+        # Temporary files are private to the owner, uploads are served publicly
+        os.chmod(path, 0o644)
+    else:
+        # Not streamed by UploadRequest, copy it over in large chunks
+        file.save(path, buffer_size=1024 * 1024)
+
+def remove_static_file(relative_path):
+    """
+    Delete a file under the static folder, such as a replaced upload.
+
+    Args:
+        relative_path (str): Path relative to the static folder, e.g. "uploads/<filename>"
+    """
+    try:
+        # One syscall instead of checking for the file first
+        os.remove(f"{STATIC_DIR}/{relative_path}")
+    except FileNotFoundError:
+        pass
+
+@app.teardown_request
+def remove_unused_uploads(exc):
+    # Drop temporary files of uploads that were rejected or never used
+    for temp_path in getattr(request, 'upload_temp_files', ()):
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
 
 class BlogCustomization:
     """
     Model class for blog customization settings.
     Handles header image and background style preferences.
     """
+    __slots__ = ('bg_style', 'header_image')
+
     def __init__(self):
         """Initialize with default customization settings."""
         self.header_image = None  # Path to header image file
@@ -97,11 +286,35 @@ class BlogCustomization:
         customization.bg_style = data.get('bg_style', 'gradient1')
         return customization
 
+def cache_clearing_field(slot):
+    """
+    Property over a BlogPost slot that drops the post's cached dictionary and
+    JSON forms whenever the field is assigned.
+    
+    Args:
+        slot (str): Name of the slot holding the value
+    """
+    def set_field(post, value):
+        setattr(post, slot, value)
+        post.clear_cache()
+    # attrgetter avoids a Python-level getter, but a read still costs a few times
+    # a plain slot access; hot paths inside BlogPost read the slots directly
+    return property(operator.attrgetter(slot), set_field)
+
 class BlogPost:
     """
     Model class representing a blog post with title, content, and optional image.
     Handles automatic ID generation and timestamp creation.
+
+    The dictionary and JSON forms of a post are cached on the instance and
+    dropped automatically when one of its editable fields is changed.
     """
+    __slots__ = ('_cached_dict', '_cached_json', '_content', '_image_path', '_title', 'created_at', 'id')
+
+    title = cache_clearing_field('_title')
+    content = cache_clearing_field('_content')
+    image_path = cache_clearing_field('_image_path')
+
     def __init__(self, title, content, id=None, created_at=None, image_path=None):
         """
         Initialize a new blog post.
@@ -113,28 +326,49 @@ class BlogPost:
             created_at (str, optional): ISO timestamp, auto-generated if not provided
             image_path (str, optional): Relative path to post image
         """
-        # Generate unique ID using timestamp if not provided
-        self.id = id if id else str(datetime.now().timestamp())
+        # Generate a random unique ID if not provided (timestamps collide under bursts)
+        self.id = id if id else secrets.token_hex(8)
         self.title = title
         self.content = content
         # Generate ISO format timestamp if not provided
         self.created_at = created_at if created_at else datetime.now().isoformat()
         self.image_path = image_path
+        self._cached_dict = None
+        self._cached_json = None
 
     def to_dict(self):
         """
         Convert blog post object to dictionary for JSON serialization.
         
         Returns:
-            dict: Dictionary representation of the blog post
+            dict: Dictionary representation of the blog post (cached, don't modify)
         """
-        return {
-            'id': self.id,
-            'title': self.title,
-            'content': self.content,
-            'created_at': self.created_at,
-            'image_path': self.image_path
-        }
+        if self._cached_dict is None:
+            # Read the slots behind the properties directly
+            self._cached_dict = {
+                'id': self.id,
+                'title': self._title,
+                'content': self._content,
+                'created_at': self.created_at,
+                'image_path': self._image_path
+            }
+        return self._cached_dict
+
+    def to_json(self):
+        """
+        Serialize blog post object to JSON.
+        
+        Returns:
+            bytes: JSON representation of the blog post (cached)
+        """
+        if self._cached_json is None:
+            self._cached_json = orjson.dumps(self.to_dict())
+        return self._cached_json
+
+    def clear_cache(self):
+        """Drop the cached dictionary and JSON forms of the post."""
+        self._cached_dict = None
+        self._cached_json = None
 
     @classmethod
     def from_dict(cls, data):
@@ -155,41 +389,266 @@ class BlogPost:
             image_path=data.get('image_path')
         )
 
-# JSON file operations
+    @staticmethod
+    def from_row(id, title, content, created_at, image_path):
+        """
+        Create BlogPost object from a row of the posts table.
+
+        Stored rows always carry every field, so this skips __init__ and its
+        ID and timestamp defaults; it runs once per post at startup.
+
+        Returns:
+            BlogPost: New blog post object with loaded data
+        """
+        post = BlogPost.__new__(BlogPost)
+        post.id = id
+        post._title = title
+        post._content = content
+        post.created_at = created_at
+        post._image_path = image_path
+        post._cached_dict = None
+        post._cached_json = None
+        return post
+
+# Database operations
+posts_db_connections = {}
+
+def get_posts_db(path=None):
+    """
+    Get the connection to a posts database, creating it on first use.
+
+    Connections are shared between threads; all writes go through the
+    background flusher while holding write_lock.
+
+    Args:
+        path (str, optional): Database file, defaults to POSTS_DB
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode
+    """
+    path = path or POSTS_DB
+    db = posts_db_connections.get(path)
+    if db is None:
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets readers carry on while a write is in progress
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        # The checkpoint threshold is given in pages
+        page_size = db.execute('PRAGMA page_size').fetchone()[0]
+        db.execute(f'PRAGMA wal_autocheckpoint={max(1, WAL_CHECKPOINT_BYTES // page_size)}')
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS posts ('
+            'id TEXT PRIMARY KEY, title TEXT, content TEXT, created_at TEXT, image_path TEXT)'
+        )
+        posts_db_connections[path] = db
+    return db
+
 def load_posts():
     """
-    Load blog posts from JSON file and convert to BlogPost objects.
+    Load blog posts from the database and convert to BlogPost objects.
     
     Returns:
-        list: List of BlogPost objects, empty list if file doesn't exist or is corrupted
+        list: List of BlogPost objects, newest first
     """
-    # Check if posts file exists, return empty list if not
-    if not os.path.exists(POSTS_FILE):
-        return []
-    
+    rows = get_posts_db().execute(
+        'SELECT id, title, content, created_at, image_path FROM posts ORDER BY created_at DESC'
+    )
+    # Build all posts in one C-level loop instead of a Python comprehension
+    return list(itertools.starmap(BlogPost.from_row, rows))
+
+def read_posts_json(path):
+    """
+    Read posts from the JSON array file written by releases before SQLite.
+
+    Args:
+        path (str): Path of the posts file
+
+    Returns:
+        list: List of BlogPost objects
+    """
+    # A corrupted file raises instead of importing nothing, so the posts aren't lost
+    with open(path, 'rb') as f:
+        return [BlogPost.from_dict(data) for data in orjson.loads(f.read())]
+
+def queue_post_write(sql, params):
+    """
+    Queue a statement against the posts table. Statements are executed by the
+    background flusher, in order and in one transaction with any other
+    statements queued in the meantime.
+
+    Every posts mutation goes through here, so this also invalidates the
+    cached API and feed responses.
+
+    Args:
+        sql (str): SQL statement to execute
+        params (tuple): Statement parameters, captured at the time of the mutation
+    """
+    global posts_version, posts_modified_at
+    with write_lock:
+        posts_version += 1
+        posts_modified_at = time.time()
+        statements = pending_post_writes.setdefault(POSTS_DB, [])
+        statements.append((sql, params))
+        if len(statements) >= FLUSH_MAX_PENDING:
+            flush_now.set()
+    writes_pending.set()
+
+def post_row(post):
+    """Column values of a post, in the order of the posts table."""
+    return (post.id, post.title, post.content, post.created_at, post.image_path)
+
+def insert_post(post):
+    """
+    Store a newly created post.
+
+    Args:
+        post (BlogPost): Post that was created
+    """
+    queue_post_write('INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?)', post_row(post))
+
+def update_post_row(post):
+    """
+    Store the new state of an edited post.
+
+    Args:
+        post (BlogPost): Post that was updated
+    """
+    queue_post_write(
+        'UPDATE posts SET title = ?, content = ?, image_path = ? WHERE id = ?',
+        (post.title, post.content, post.image_path, post.id)
+    )
+
+def delete_post_row(post_id):
+    """
+    Delete a post from the database.
+
+    Args:
+        post_id (str): Unique identifier of the deleted post
+    """
+    queue_post_write('DELETE FROM posts WHERE id = ?', (post_id,))
+
+def seed_posts_db(path=None):
+    """
+    Import posts.json into a new, empty posts database.
+
+    Workers started side by side all run this at import; the check and the
+    import share one write transaction, so exactly one of them seeds and the
+    others wait for it and then load the seeded posts. The database's
+    user_version records that seeding was done, so a blog whose posts were
+    all deleted isn't seeded again.
+
+    Args:
+        path (str, optional): Database file, defaults to POSTS_DB
+    """
+    db = get_posts_db(path)
+    db.execute('BEGIN IMMEDIATE')
     try:
-        # Open and parse JSON file
-        with open(POSTS_FILE, 'r') as f:
-            data = json.load(f)
-            # Convert each dictionary to BlogPost object using class method
-            return [BlogPost.from_dict(post) for post in data]
-    except json.JSONDecodeError:
-        # Return empty list if JSON is corrupted or invalid
-        return []
-
-def save_posts(posts):
-    """
-    Save list of BlogPost objects to JSON file.
-    
+        seeded = db.execute('PRAGMA user_version').fetchone()[0]
+        empty = db.execute('SELECT 1 FROM posts LIMIT 1').fetchone() is None
+        if not seeded and empty and os.path.exists(LEGACY_POSTS_FILE):
+            db.executemany(
+                'INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?)',
+                [post_row(post) for post in read_posts_json(LEGACY_POSTS_FILE)]
+            )
+        db.execute('PRAGMA user_version = 1')
+        db.execute('COMMIT')
+    except (OSError, ValueError, sqlite3.Error):
+        db.execute('ROLLBACK')
+        raise
+
+# Carry posts over from posts.json the first time the database is used
+seed_posts_db()
+
+# Initialize blog posts by loading from the database at startup
+# (a deque, so new posts can be put in front in constant time)
+posts = collections.deque(load_posts())
+# Index of posts by ID for constant-time lookups, kept in sync with the posts list
+posts_by_id = {post.id: post for post in posts}
+# Last seen PRAGMA data_version per database, to notice commits by other workers.
+# Values are only comparable on one connection, so record the baseline right
+# after the initial load on the connection the checks will use.
+posts_data_versions = {POSTS_DB: get_posts_db().execute('PRAGMA data_version').fetchone()[0]}
+
+def add_post(post):
+    """
+    Put a new post in front of the in-memory posts and queue its insert.
+
     Args:
-        posts (list): List of BlogPost objects to save
+        post (BlogPost): Post that was created
     """
-    # Convert BlogPost objects to dictionaries and save to file with formatting
-    with open(POSTS_FILE, 'w') as f:
-        json.dump([post.to_dict() for post in posts], f, indent=2)
+    with write_lock:
+        posts.appendleft(post)
+        posts_by_id[post.id] = post
+        insert_post(post)
+
+def edit_post(post_id, **fields):
+    """
+    Change fields of a post and queue the update.
+
+    The post is looked up again under the lock, so an edit can't land on a
+    copy that a concurrent reload has already replaced.
 
-# Initialize blog posts by loading from JSON file at startup
-posts = load_posts()
+    Args:
+        post_id (str): Unique identifier of the post
+        **fields: New values for title, content or image_path
+
+    Returns:
+        BlogPost: The updated post, None if it no longer exists
+    """
+    with write_lock:
+        post = posts_by_id.get(post_id)
+        if post is not None:
+            for name, value in fields.items():
+                setattr(post, name, value)
+            update_post_row(post)
+        return post
+
+def remove_post(post_id):
+    """
+    Remove a post from the in-memory posts and queue its delete.
+
+    Args:
+        post_id (str): Unique identifier of the post
+
+    Returns:
+        BlogPost: The removed post, None if it no longer exists
+    """
+    with write_lock:
+        post = posts_by_id.pop(post_id, None)
+        if post is not None:
+            posts.remove(post)
+            delete_post_row(post_id)
+        return post
+
+def sync_posts_from_db():
+    """
+    Reload the in-memory posts if another process committed to the database.
+
+    Each worker of a multi-process server keeps its own copy of the posts;
+    PRAGMA data_version changes whenever a different connection commits, so
+    checking it is enough to pick up other workers' changes without rereading
+    the table on every request.
+    """
+    global posts_version, posts_modified_at
+    # Usually nothing changed, find that out without waiting for the lock
+    if get_posts_db().execute('PRAGMA data_version').fetchone()[0] == posts_data_versions.get(POSTS_DB):
+        return
+    with write_lock:
+        # Our own queued changes aren't in the database yet, reloading now would drop them
+        if pending_post_writes.get(POSTS_DB):
+            return
+        data_version = get_posts_db().execute('PRAGMA data_version').fetchone()[0]
+        # Without a baseline for this connection, anything may have changed since the posts were loaded
+        if posts_data_versions.get(POSTS_DB) == data_version:
+            return
+        posts_data_versions[POSTS_DB] = data_version
+        # Update in place so existing references to posts stay valid
+        posts.clear()
+        posts.extend(load_posts())
+        posts_by_id.clear()
+        posts_by_id.update((post.id, post) for post in posts)
+        posts_version += 1
+        posts_modified_at = time.time()
 
 # File path for customization settings storage
 CUSTOMIZATION_FILE = os.path.join(os.path.dirname(__file__), 'customization.json')
@@ -205,9 +664,9 @@ def load_customization():
     if os.path.exists(CUSTOMIZATION_FILE):
         try:
             # Load and parse customization data from JSON
-            with open(CUSTOMIZATION_FILE, 'r') as f:
-                return BlogCustomization.from_dict(json.load(f))
-        except json.JSONDecodeError:
+            with open(CUSTOMIZATION_FILE, 'rb') as f:
+                return BlogCustomization.from_dict(orjson.loads(f.read()))
+        except orjson.JSONDecodeError:
             # Return default customization if JSON is corrupted
             return BlogCustomization()
     # Return default customization if file doesn't exist
@@ -215,17 +674,122 @@ def load_customization():
 
 def save_customization(customization):
     """
-    Save blog customization settings to JSON file.
+    Queue blog customization settings to be saved to JSON file by the
+    background flusher.
     
     Args:
         customization (BlogCustomization): Customization object to save
     """
-    # Convert to dictionary and save with pretty formatting
-    with open(CUSTOMIZATION_FILE, 'w') as f:
-        json.dump(customization.to_dict(), f, indent=2)
+    global customization_modified_at, customization_items
+    # Snapshot the settings now so later changes don't leak into this write
+    settings = customization.to_dict()
+    with write_lock:
+        customization_modified_at = time.time()
+        customization_items = tuple(settings.items())
+        pending_customization[CUSTOMIZATION_FILE] = settings
+    writes_pending.set()
 
 # Initialize blog customization by loading from JSON file at startup
 customization = load_customization()
+# Settings as a hashable snapshot for the feed cache key; every change goes
+# through save_customization, which rebuilds it, so requests needn't
+customization_items = tuple(customization.to_dict().items())
+
+# Background write-back
+def flush_pending_writes():
+    """
+    Write all queued post changes and customization settings to disk.
+
+    Safe to call from any thread; used by the background flusher, at exit and
+    by tests that need the files to be up to date.
+    """
+    with write_lock:
+        for path in list(pending_post_writes):
+            db = get_posts_db(path)
+            # One transaction per flush no matter how many mutations were queued
+            db.execute('BEGIN')
+            try:
+                for sql, params in pending_post_writes[path]:
+                    db.execute(sql, params)
+                db.execute('COMMIT')
+            except sqlite3.Error:
+                db.execute('ROLLBACK')
+                raise
+            del pending_post_writes[path]
+
+    # Customization files are written outside write_lock, so requests that
+    # change posts don't wait for their fsync; this lock only keeps two
+    # flushes from writing the same file out of order
+    with customization_file_lock:
+        with write_lock:
+            settings_by_path = dict(pending_customization)
+            pending_customization.clear()
+        for path, settings in settings_by_path.items():
+            try:
+                write_customization_file(path, settings)
+            except OSError:
+                # Queue the settings again unless newer ones arrived meanwhile
+                with write_lock:
+                    pending_customization.setdefault(path, settings)
+                raise
+
+def write_customization_file(path, settings):
+    """
+    Atomically replace a customization settings file.
+
+    Args:
+        path (str): Path of the settings file
+        settings (dict): Settings to store
+    """
+    # Write to a temporary file in the same directory and swap it in, so
+    # readers never see a partial file and a crash leaves the old one intact
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.customization-')
+    try:
+        # mkstemp creates the file private to the owner, keep the usual permissions
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'wb') as f:
+            # Compact output, written with a single call
+            f.write(orjson.dumps(settings))
+            f.flush()
+            # Make sure the data is on disk before the rename makes it visible
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except OSError:
+        os.unlink(tmp_file)
+        raise
+
+def flush_worker():
+    """Background loop that flushes queued writes shortly after they are made."""
+    while True:
+        writes_pending.wait()
+        # Give a burst of mutations time to pile up so they share one write,
+        # unless enough of them are queued already
+        flush_now.wait(FLUSH_DELAY)
+        writes_pending.clear()
+        flush_now.clear()
+        try:
+            flush_pending_writes()
+        except (OSError, sqlite3.Error):
+            # Leave the writes queued and retry on the next mutation
+            app.logger.exception('Failed to flush pending writes')
+
+def start_flush_worker():
+    threading.Thread(target=flush_worker, name='typo-flush', daemon=True).start()
+
+def reset_after_fork():
+    """Set up a forked worker: SQLite connections must not be shared across processes."""
+    posts_db_connections.clear()
+    # data_version values of the parent's connection mean nothing on a new one
+    posts_data_versions.clear()
+    start_flush_worker()
+
+start_flush_worker()
+# Forked workers (e.g. gunicorn --preload) don't inherit threads or usable
+# database connections, give each its own
+os.register_at_fork(after_in_child=reset_after_fork)
+# gunicorn turns SIGTERM into a normal interpreter exit, so this also covers
+# worker shutdown without running disk I/O inside a signal handler
+atexit.register(flush_pending_writes)
 
 @app.route('/')
 def home():
@@ -238,13 +802,45 @@ def start_timer():
     g._start_time = time.time()
 
 
+# Views that read or change existing posts; others don't need to check the database
+SYNCED_ENDPOINTS = frozenset({
+    'feed', 'get_posts', 'get_post', 'update_post', 'delete_post_api',
+    'delete_post', 'edit_post_page', 'update_post_submit',
+})
+
+@app.before_request
+def sync_posts():
+    # pick up posts written by other worker processes
+    if request.endpoint in SYNCED_ENDPOINTS:
+        sync_posts_from_db()
+
+
+# Labelled metric children, memoized so requests skip the .labels() lookup
+latency_by_endpoint = {}
+count_by_label = {}
+
+def metrics_endpoint():
+    """
+    Endpoint label for the current request: the matched URL rule rather than
+    the raw path, so every /api/posts/<post_id> shares one label.
+    """
+    return request.url_rule.rule if request.url_rule else '<unmatched>'
+
 @app.after_request
 def record_metrics(response):
     try:
         latency = time.time() - getattr(g, '_start_time', time.time())
-        endpoint = request.path
-        REQUEST_LATENCY.labels(endpoint=endpoint).observe(latency)
-        REQUEST_COUNT.labels(method=request.method, endpoint=endpoint, http_status=response.status_code).inc()
+        endpoint = metrics_endpoint()
+        histogram = latency_by_endpoint.get(endpoint)
+        if histogram is None:
+            histogram = latency_by_endpoint.setdefault(endpoint, REQUEST_LATENCY.labels(endpoint=endpoint))
+        histogram.observe(latency)
+
+        key = (request.method, endpoint, response.status_code)
+        counter = count_by_label.get(key)
+        if counter is None:
+            counter = count_by_label.setdefault(key, REQUEST_COUNT.labels(method=key[0], endpoint=endpoint, http_status=key[2]))
+        counter.inc()
     except Exception:
         # don't let metrics break responses
         pass
@@ -255,7 +851,7 @@ def record_metrics(response):
 def handle_exception(e):
     # increment error metric and return generic error response
     try:
-        ERROR_COUNT.labels(endpoint=request.path).inc()
+        ERROR_COUNT.labels(endpoint=metrics_endpoint()).inc()
     except Exception:
         pass
     return jsonify({'error': 'Internal server error'}), 500
@@ -273,9 +869,102 @@ def metrics():
     resp = generate_latest()
     return (resp, 200, {'Content-Type': CONTENT_TYPE_LATEST})
 
+def make_etag(*parts, per_process=True):
+    """
+    Build an ETag from the values a response was rendered from.
+    
+    Args:
+        *parts: Values identifying the response
+        per_process (bool): Mix in ETAG_SALT, needed when the parts are only
+            meaningful within this process (like posts_version); leave it out
+            for tags hashed from the content itself, so they match across workers
+    
+    Returns:
+        str: Short hex digest identifying this version of the response
+    """
+    if per_process:
+        parts = (ETAG_SALT,) + parts
+    data = '\0'.join(map(str, parts)).encode()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def not_modified(etag, last_modified=None):
+    """
+    Check the request's conditional headers against the current version of a
+    response: If-None-Match against its ETag, or, when the client sent no
+    ETags, If-Modified-Since against its last modification time.
+
+    Compressed responses carry the ETag with the encoding appended
+    ("<etag>:gzip"), so those variants match as well.
+    
+    Args:
+        etag (str): ETag of the current response
+        last_modified (float, optional): Unix time the response content last changed
+        
+    Returns:
+        Response: Empty 304 response if the client's copy is current, None otherwise
+    """
+    tags = request.if_none_match
+    if tags:
+        fresh = tags.star_tag or any(tag.partition(':')[0] == etag for tag in tags.as_set(include_weak=True))
+    else:
+        since = request.if_modified_since
+        # HTTP dates have whole-second resolution, so a change later in the current
+        # second would go unnoticed; only trust seconds that are already over
+        fresh = (
+            since is not None and last_modified is not None
+            and int(last_modified) < int(time.time())
+            and since.timestamp() >= int(last_modified)
+        )
+    if fresh:
+        response = Response(status=304)
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        return response
+    return None
+
 @app.route('/feed')
 def feed():
-    return render_template('index.html', posts=posts, customization=customization)
+    global feed_html_cache
+    key = (posts_version, customization_items)
+    etag = make_etag(*key)
+    last_modified = max(posts_modified_at, customization_modified_at)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+
+    # Re-render only when the posts or the customization settings changed
+    html, cached_key = feed_html_cache
+    if cached_key != key:
+        # Render from a snapshot, a concurrent change would break iterating the deque
+        with write_lock:
+            snapshot = list(posts)
+        html = render_template('index.html', posts=snapshot, customization=customization)
+        feed_html_cache = (html, key)
+    response = Response(html, mimetype='text/html')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
+
+@app.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    """
+    Serve an uploaded image from the upload folder.
+
+    send_from_directory hands the open file to the WSGI server's file
+    wrapper (sendfile under gunicorn) and answers conditional requests.
+    """
+    return send_from_directory(app.config['UPLOAD_FOLDER'], filename, conditional=True, max_age=UPLOAD_MAX_AGE)
+
+@app.template_global()
+def upload_url(image_path):
+    """
+    URL of a stored upload.
+    
+    Args:
+        image_path (str): Stored path of the upload, e.g. "uploads/<filename>"
+    """
+    return url_for('uploaded_file', filename=image_path.removeprefix('uploads/'))
 
 @app.route('/customize', methods=['GET'])
 def customize():
@@ -294,24 +983,14 @@ def save_customization_route():
         if file and file.filename:
             # Validate file type against allowed extensions
             if allowed_file(file.filename):
-                # Secure the filename to prevent directory traversal attacks
-                filename = secure_filename(file.filename)
-                # Add timestamp to prevent filename conflicts
-                timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-                filename = f"header-{timestamp}-{filename}"
-                
-                # Ensure upload directory exists
-                if not os.path.exists(app.config['UPLOAD_FOLDER']):
-                    os.makedirs(app.config['UPLOAD_FOLDER'])
+                filename = upload_filename(file.filename, prefix='header-')
                 
                 # Save the uploaded file
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+                save_upload(file, filename)
                 
                 # Clean up: remove old header image if it exists
                 if customization.header_image:
-                    old_path = os.path.join(app.static_folder, customization.header_image)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
+                    remove_static_file(customization.header_image)
                 
                 # Update customization with new image path
                 customization.header_image = f"uploads/{filename}"
@@ -327,16 +1006,73 @@ def save_customization_route():
 
 @app.route('/api/posts', methods=['GET'])
 def get_posts():
-    # Return all posts
-    return jsonify([post.to_dict() for post in posts])
+    global posts_json_cache
+    # Return one page of posts, selected with ?offset= and ?limit=
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'offset must be >= 0 and limit between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    # The version identifies the posts list, the URL already identifies the page
+    etag = make_etag(posts_version)
+    last_modified = posts_modified_at
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+
+    # Serialize a page again only after a mutation
+    pages, version = posts_json_cache
+    if version != posts_version:
+        pages, version = {}, posts_version
+        posts_json_cache = (pages, version)
+    page = pages.get((offset, limit))
+    if page is None:
+        # Copy the page under the lock, a concurrent change would break iterating the deque
+        with write_lock:
+            page_posts = list(itertools.islice(posts, offset, offset + limit))
+        # Stitch the array together from each post's cached JSON
+        body = b'[' + b','.join([post.to_json() for post in page_posts]) + b']'
+        # Keep the cache bounded when clients walk through many different pages
+        if len(pages) >= 256:
+            pages.clear()
+        page = pages[(offset, limit)] = [body, None]
+
+    body = page[0]
+    if len(body) >= app.config['COMPRESS_MIN_SIZE'] and request.accept_encodings['gzip']:
+        # Compress each page once and reuse it, rather than on every request
+        if page[1] is None:
+            page[1] = gzip.compress(body, compresslevel=app.config['COMPRESS_LEVEL'], mtime=0)
+        response = Response(page[1], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(f'{etag}:gzip')
+    else:
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+    response.last_modified = last_modified
+    if offset + limit < len(posts):
+        next_url = url_for('get_posts', offset=offset + limit, limit=limit)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @app.route('/api/posts/<post_id>', methods=['GET'])
 def get_post(post_id):
     # Find the post with the given ID
-    post = next((post for post in posts if post.id == post_id), None)
+    post = posts_by_id.get(post_id)
     if post is None:
         return jsonify({'error': 'Post not found'}), 404
-    return jsonify(post.to_dict())
+
+    # Tag the post by its content so edits produce a new ETag, and every
+    # worker and restart hands out the same tag for the same post
+    etag = make_etag(post.to_json(), per_process=False)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    response = jsonify(post.to_dict())
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/posts', methods=['POST'])
 def create_post_api():
@@ -349,8 +1085,8 @@ def create_post_api():
     
     # Create new blog post
     new_post = BlogPost(title=data['title'], content=data['content'])
-    posts.append(new_post)
-    save_posts(posts)
+    # Newest first, the same order the posts are loaded from the database in
+    add_post(new_post)
     return jsonify(new_post.to_dict()), 201
 
 @app.route('/api/posts/<post_id>', methods=['PUT'])
@@ -359,47 +1095,35 @@ def update_post(post_id):
     data = request.get_json()
     
     # Find the post with the given ID
-    post = next((post for post in posts if post.id == post_id), None)
+    post = posts_by_id.get(post_id)
     if post is None:
         return jsonify({'error': 'Post not found'}), 404
     
-    # Update post data
-    post.title = data.get('title', post.title)
-    post.content = data.get('content', post.content)
-    
-    # Save changes
-    save_posts(posts)
+    # Update post data and save the changes
+    post = edit_post(
+        post_id,
+        title=data.get('title', post.title),
+        content=data.get('content', post.content)
+    )
+    if post is None:
+        return jsonify({'error': 'Post not found'}), 404
     return jsonify(post.to_dict())
 
 @app.route('/api/posts/<post_id>', methods=['DELETE'])
 def delete_post_api(post_id):
-    # Find the post with the given ID
-    post = next((post for post in posts if post.id == post_id), None)
-    if post is None:
+    # Remove the post from the list and the index, and delete it from the database
+    if remove_post(post_id) is None:
         return jsonify({'error': 'Post not found'}), 404
     
-    # Remove the post from the list
-    posts.remove(post)
-    
-    # Save to JSON file
-    save_posts(posts)
-    
     # Return success message
     return jsonify({'message': 'Post deleted successfully'}), 200
 
 @app.route('/posts/<post_id>/delete', methods=['POST'])
 def delete_post(post_id):
-    # Find the post with the given ID
-    post = next((post for post in posts if post.id == post_id), None)
-    if post is None:
+    # Remove the post from the list and the index, and delete it from the database
+    if remove_post(post_id) is None:
         return "Post not found!", 404
     
-    # Remove the post from the list
-    posts.remove(post)
-    
-    # Save to JSON file
-    save_posts(posts)
-    
     # Redirect back to home page
     return redirect(url_for('feed'))
 
@@ -425,29 +1149,21 @@ def create_post():
         # Validate file exists and is allowed type
         if file and allowed_file(file.filename):
             # Secure filename and add timestamp to prevent conflicts
-            filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-            filename = f"{timestamp}-{filename}"
-            
-            # Ensure upload directory exists
-            if not os.path.exists(app.config['UPLOAD_FOLDER']):
-                os.makedirs(app.config['UPLOAD_FOLDER'])
+            filename = upload_filename(file.filename)
             
             # Save file and store relative path
-            file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+            save_upload(file, filename)
             image = f"uploads/{filename}"
     
     # Create new blog post object
     new_post = BlogPost(title=title, content=content, image_path=image)
-    # Insert at beginning to show newest posts first
-    posts.insert(0, new_post)
-    # Persist changes to JSON file
-    save_posts(posts)
+    # Insert at beginning to show newest posts first, and persist it to the database
+    add_post(new_post)
     return redirect(url_for('feed'))
 
 @app.route('/posts/<post_id>/edit', methods=['GET'])
 def edit_post_page(post_id):
-    post = next((post for post in posts if post.id == post_id), None)
+    post = posts_by_id.get(post_id)
     if post is None:
         return "Post not found!", 404
     return render_template('edit.html', post=post)
@@ -461,14 +1177,17 @@ def update_post_submit(post_id):
     Args:
         post_id (str): Unique identifier of the post to update
     """
-    # Find the post by ID using generator expression
-    post = next((post for post in posts if post.id == post_id), None)
+    # Find the post by ID using the index
+    post = posts_by_id.get(post_id)
     if post is None:
         return "Post not found!", 404
     
     # Update post fields with form data, keeping existing values as fallback
-    post.title = request.form.get('title', post.title)
-    post.content = request.form.get('content', post.content)
+    fields = {
+        'title': request.form.get('title', post.title),
+        'content': request.form.get('content', post.content),
+    }
+    old_image = post.image_path
     
     # Process optional image update
     if 'image' in request.files:
@@ -476,39 +1195,30 @@ def update_post_submit(post_id):
         # Check if new image file was provided
         if file and file.filename:
             if allowed_file(file.filename):
-                # Clean up: remove old image file to save disk space
-                if post.image_path:
-                    old_path = os.path.join(app.static_folder, post.image_path)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-                
                 # Process new image file with secure naming
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-                filename = f"{timestamp}-{filename}"
-                
-                # Ensure upload directory exists
-                if not os.path.exists(app.config['UPLOAD_FOLDER']):
-                    os.makedirs(app.config['UPLOAD_FOLDER'])
+                filename = upload_filename(file.filename)
                 
                 # Save new image and update post reference
-                file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-                post.image_path = f"uploads/{filename}"
+                save_upload(file, filename)
+                fields['image_path'] = f"uploads/{filename}"
     
-    # Persist all changes to JSON file
-    save_posts(posts)
+    # Apply and persist all changes to the database
+    if edit_post(post_id, **fields) is None:
+        # Deleted in the meantime, don't keep its new image around
+        if 'image_path' in fields:
+            remove_static_file(fields['image_path'])
+        return "Post not found!", 404
+    # Clean up: remove old image file to save disk space
+    if old_image and 'image_path' in fields:
+        remove_static_file(old_image)
     return redirect(url_for('feed'))
 
 if __name__ == '__main__':
     """
     Main execution block - runs when script is executed directly.
-    Sets up upload directory and starts Flask development server.
+    Starts Flask development server.
     """
     print("Starting Flask app on http://localhost:8000 ...")
     
-    # Ensure upload directory exists before starting server
-    if not os.path.exists(app.config['UPLOAD_FOLDER']):
-        os.makedirs(app.config['UPLOAD_FOLDER'])
-    
     # Start Flask development server with debug mode enabled
     app.run(debug=True, port=8000)